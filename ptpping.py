@@ -13,7 +13,6 @@ from pathlib import Path
 from typing import Optional
 
 import click
-import toml
 
 from ptpping.core.config import Config
 from ptpping.core.logger import setup_logging
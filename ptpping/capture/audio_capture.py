@@ -4,18 +4,36 @@ Captures audio from loopback device and detects tone bursts for latency measurem
 """
 
 import logging
+import math
+import queue
 import threading
 import time
 from typing import Optional, List, Tuple
 
 import numpy as np
-import pyaudio
-import scipy.signal as signal
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+import scipy.fft
+import sounddevice as sd
+from influxdb_client import InfluxDBClient
+from influxdb_client.client.write_api import WriteOptions
+
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
 
 from ..core.config import Config
 from ..core.ptp_time import PTPTimeManager
+from .dsp import HAVE_NUMBA, detect_tones, goertzel_coefficient, target_bin
+
+log = logging.getLogger(__name__)
+
+# Queued after the last chunk to wake and stop the worker thread
+_STOP = object()
+
+
+def _escape_tag(value: str) -> str:
+    """Escape a tag key or value for InfluxDB line protocol."""
+    return value.replace(',', r'\,').replace('=', r'\=').replace(' ', r'\ ')
 
 
 class AudioCapture:
@@ -23,31 +41,108 @@ class AudioCapture:
     
     def __init__(self, config: Config):
         self.config = config
-        self.logger = logging.getLogger(__name__)
         self.ptp_time = PTPTimeManager(config.ptp)
         
         self._running = False
         self._thread = None
-        self._audio = None
         self._stream = None
         
         # InfluxDB client
         self._influx_client = None
         self._write_api = None
         
-        # Audio processing parameters
-        self._chunk_size = 1024
+        # Audio processing parameters; small blocks keep capture latency low
+        # (128 samples is 2.7 ms at 48 kHz), while the tone is analysed over
+        # a longer window that slides forward by one block per hop, so the
+        # tone bin stays narrow enough to reject hum and DC
+        self._chunk_size = 128
+        self._window_size = 1024
         self._sample_rate = config.audio.sample_rate
         self._tone_frequency = config.audio.tone_frequency
         self._burst_duration = config.audio.burst_duration
+        self._burst_interval = config.audio.burst_interval
+        
+        # Captured chunks handed from the audio callback to the worker thread.
+        # The callback copies into a preallocated pool and queues the slot
+        # index; the pool is twice the queue limit so a queued slot is never
+        # overwritten before the worker has copied it out.
+        self._frames = queue.SimpleQueue()
+        self._max_queued_chunks = 512
+        self._chunk_pool = np.empty((2 * self._max_queued_chunks, self._chunk_size), dtype=np.float32)
+        self._chunk_pool_index = 0
+        self._dropped_chunks = 0
+        
+        # Values used on every detected burst
+        self._bucket = config.influxdb.database
+        self._switch_name = config.network.switch_name
+        self._host_name = config.network.host_name
+        self._vlan_id_str = str(config.network.vlan_id)
+        
+        # Constant measurement and tags of the InfluxDB line protocol record
+        self._point_prefix = (
+            f"audio_latency,switch={_escape_tag(self._switch_name)},"
+            f"host={_escape_tag(self._host_name)},vlan={_escape_tag(self._vlan_id_str)}"
+        )
+        
+        # DFT bin closest to the tone frequency
+        self._target_bin = target_bin(self._window_size, self._tone_frequency, self._sample_rate)
+        self._goertzel_coeff = goertzel_coefficient(self._window_size, self._target_bin)
+        
+        # Hann window to keep off-bin energy out of the target bin
+        self._window = np.hanning(self._window_size).astype(np.float32)
+        self._window_gain = float(self._window.sum())
+        
+        # Chunks are analysed in batches to amortise per-call overhead. The
+        # sample buffer holds the tail of the previous batch followed by the
+        # new chunks, and each row of the strided window view is the analysis
+        # window ending at one chunk.
+        self._batch_size = 32
+        self._history_size = self._window_size - self._chunk_size
+        self._samples = np.zeros(self._history_size + self._batch_size * self._chunk_size, dtype=np.float32)
+        self._windows = np.lib.stride_tricks.as_strided(
+            self._samples,
+            shape=(self._batch_size, self._window_size),
+            strides=(self._chunk_size * self._samples.itemsize, self._samples.itemsize)
+        )
+        self._windowed = None
+        self._batch_adc_times = np.empty(self._batch_size, dtype=np.float64)
+        self._powers = np.empty(self._batch_size, dtype=np.float64)
+        self._hits = np.empty(self._batch_size, dtype=bool)
+        
+        # Persistent FFTW plan, or a windowed copy of the batch, for the FFT
+        # fallback; windows overlap in the sample buffer, so the window
+        # cannot be applied in place
+        self._fft = None
+        if not HAVE_NUMBA and pyfftw is not None:
+            self._fft_in = pyfftw.empty_aligned(self._window_size, dtype='float32')
+            self._fft_out = pyfftw.empty_aligned(self._window_size // 2 + 1, dtype='complex64')
+            self._fft = pyfftw.FFTW(
+                self._fft_in,
+                self._fft_out,
+                flags=('FFTW_MEASURE', 'FFTW_DESTROY_INPUT')
+            )
+        elif not HAVE_NUMBA:
+            self._windowed = np.empty((self._batch_size, self._window_size), dtype=np.float32)
         
         # Detection parameters
         self._detection_threshold = 0.1
+        # Threshold on the unnormalized bin power, so detection needs no sqrt
+        self._threshold_sq = (self._detection_threshold * self._window_gain) ** 2
         self._min_burst_gap = 0.5  # Minimum time between bursts
         
         # State tracking
         self._last_burst_time = 0
-        self._detected_bursts = []
+        
+        # Detected bursts, stored column-wise in ring buffers
+        self._burst_capacity = 10000
+        self._burst_count = 0
+        self._burst_ptp_time = np.zeros(self._burst_capacity)
+        self._burst_system_time = np.zeros(self._burst_capacity)
+        self._burst_detection_time = np.zeros(self._burst_capacity)
+        self._burst_expected_time = np.zeros(self._burst_capacity)
+        self._burst_latency_ms = np.zeros(self._burst_capacity)
+        self._burst_magnitude = np.zeros(self._burst_capacity)
+        self._stream_time_offset = 0.0  # System epoch minus PortAudio stream time
         
         # Initialize InfluxDB connection
         self._init_influxdb()
@@ -64,55 +159,96 @@ class AudioCapture:
             # Test connection
             self._influx_client.ping()
             
-            self._write_api = self._influx_client.write_api(write_options=SYNCHRONOUS)
+            # Batch points in the background instead of blocking per burst
+            write_options = WriteOptions(
+                batch_size=500,
+                flush_interval=1_000,
+                jitter_interval=0,
+                retry_interval=5_000,
+                max_retries=3,
+                max_retry_delay=30_000,
+                exponential_base=2
+            )
+            self._write_api = self._influx_client.write_api(write_options=write_options)
             
-            self.logger.info("InfluxDB connection established")
+            log.info("InfluxDB connection established")
             
         except Exception as e:
-            self.logger.error(f"Failed to connect to InfluxDB: {e}")
+            log.error(f"Failed to connect to InfluxDB: {e}")
             self._influx_client = None
             self._write_api = None
     
     def start(self) -> None:
         """Start the audio capture."""
         if self._running:
-            self.logger.warning("Audio capture already running")
+            log.warning("Audio capture already running")
             return
         
+        self._validate()
+        
+        # Start the analysis windows from silence rather than a previous run
+        self._samples.fill(0)
+        
         try:
-            self._audio = pyaudio.PyAudio()
-            self._start_audio_stream()
-            
+            # Start the worker before the stream so no chunk is missed
             self._running = True
             self._thread = threading.Thread(target=self._run, daemon=True)
             self._thread.start()
             
-            self.logger.info("Audio capture started")
+            self._start_audio_stream()
+            
+            log.info("Audio capture started")
             
         except Exception as e:
-            self.logger.error(f"Failed to start audio capture: {e}")
+            log.error(f"Failed to start audio capture: {e}")
+            self._running = False
+            self._frames.put(_STOP)
+            self._thread.join(timeout=5)
+            self._thread = None
             raise
     
+    def _validate(self) -> None:
+        """Check detection preconditions once, so the processing path need not."""
+        if self._detection_threshold <= 0:
+            raise ValueError(f"Detection threshold must be positive: {self._detection_threshold}")
+        
+        # The Hann main lobe is two bins wide on each side, so a bin closer
+        # to DC or Nyquist would also pick up hum and DC offset
+        if not 2 < self._target_bin < self._window_size // 2 - 2:
+            raise ValueError(
+                f"Tone frequency {self._tone_frequency} Hz cannot be resolved with a "
+                f"{self._window_size}-sample window at {self._sample_rate} Hz"
+            )
+        
+        if not self.ptp_time.is_synchronized():
+            log.warning("PTP not synchronized, latencies will be measured against system time")
+    
     def stop(self) -> None:
         """Stop the audio capture."""
         self._running = False
         
         if self._stream:
-            self._stream.stop_stream()
+            self._stream.stop()
             self._stream.close()
             self._stream = None
         
-        if self._audio:
-            self._audio.terminate()
-            self._audio = None
-        
         if self._thread:
+            # Let the worker finish the queued chunks, then exit
+            self._frames.put(_STOP)
             self._thread.join(timeout=5)
+            self._thread = None
+        
+        if self._write_api:
+            # Flush pending points before closing the client
+            self._write_api.close()
+            self._write_api = None
         
         if self._influx_client:
             self._influx_client.close()
         
-        self.logger.info("Audio capture stopped")
+        self.ptp_time.close()
+        
+        log.info("Audio capture stopped")
     
     def _start_audio_stream(self) -> None:
         """Start the audio input stream."""
@@ -120,170 +256,218 @@ class AudioCapture:
             # Find the loopback device
             device_index = self._find_loopback_device()
             
-            self._stream = self._audio.open(
-                format=pyaudio.paFloat32,
+            self._stream = sd.InputStream(
+                samplerate=self._sample_rate,
+                blocksize=self._chunk_size,
+                dtype='float32',
                 channels=1,
-                rate=self._sample_rate,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=self._chunk_size,
-                stream_callback=self._audio_callback
+                device=device_index,
+                latency='low',
+                callback=self._audio_callback
             )
             
-            self._stream.start_stream()
-            self.logger.info(f"Audio stream started on device {device_index}")
+            self._stream.start()
+            
+            # Anchor PortAudio stream time to the system epoch once
+            self._stream_time_offset = time.time() - self._stream.time
+            log.info(f"Audio stream started on device {device_index}")
             
         except Exception as e:
-            self.logger.error(f"Failed to start audio stream: {e}")
+            log.error(f"Failed to start audio stream: {e}")
             raise
     
-    def _find_loopback_device(self) -> int:
-        """Find the loopback audio device."""
+    def _find_loopback_device(self) -> Optional[int]:
+        """Find the loopback audio device, or None for the default input."""
         try:
-            for i in range(self._audio.get_device_count()):
-                device_info = self._audio.get_device_info_by_index(i)
-                if (self.config.audio.loopback_device in device_info['name'] or
-                    'loopback' in device_info['name'].lower()):
-                    self.logger.info(f"Found loopback device: {device_info['name']}")
+            for i, device_info in enumerate(sd.query_devices()):
+                if device_info['max_input_channels'] > 0 and (
+                        self.config.audio.loopback_device in device_info['name'] or
+                        'loopback' in device_info['name'].lower()):
+                    log.info(f"Found loopback device: {device_info['name']}")
                     return i
             
             # Fallback to default input device
-            self.logger.warning("Loopback device not found, using default input")
-            return self._audio.get_default_input_device_info()['index']
+            log.warning("Loopback device not found, using default input")
+            return None
             
         except Exception as e:
-            self.logger.error(f"Error finding loopback device: {e}")
-            return 0
+            log.error(f"Error finding loopback device: {e}")
+            return None
     
-    def _audio_callback(self, in_data, frame_count, time_info, status):
+    def _audio_callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
         """Audio stream callback for processing incoming audio data."""
         if not self._running:
-            return (None, pyaudio.paComplete)
+            raise sd.CallbackStop
         
-        try:
-            # Convert bytes to numpy array
-            audio_data = np.frombuffer(in_data, dtype=np.float32)
+        # Hand a copy of the chunk to the worker thread; drop it rather
+        # than block the real-time audio thread if the worker falls behind
+        if self._frames.qsize() < self._max_queued_chunks:
+            # Some host APIs report no ADC time; the current stream time is
+            # on the same clock and close to capture for a low-latency stream
+            adc_time = time_info.inputBufferAdcTime or self._stream.time
             
-            # Process audio chunk for tone detection
-            self._process_audio_chunk(audio_data, time_info)
-            
-        except Exception as e:
-            self.logger.error(f"Error in audio callback: {e}")
-        
-        return (None, pyaudio.paContinue)
+            slot = self._chunk_pool_index
+            self._chunk_pool[slot] = indata[:, 0]
+            self._chunk_pool_index = (slot + 1) % len(self._chunk_pool)
+            self._frames.put_nowait((slot, adc_time))
+        else:
+            self._dropped_chunks += 1
     
-    def _process_audio_chunk(self, audio_data: np.ndarray, time_info: dict) -> None:
-        """Process audio chunk for tone burst detection."""
-        try:
-            # Apply FFT to detect tone frequency
-            fft_data = np.fft.fft(audio_data)
-            freqs = np.fft.fftfreq(len(audio_data), 1.0 / self._sample_rate)
-            
-            # Find the bin closest to our target frequency
-            target_bin = np.argmin(np.abs(freqs - self._tone_frequency))
-            magnitude = np.abs(fft_data[target_bin])
-            
-            # Normalize magnitude
-            normalized_magnitude = magnitude / len(audio_data)
-            
-            # Check if we detected a tone burst
-            if normalized_magnitude > self._detection_threshold:
-                current_time = time.time()
-                
-                # Check if enough time has passed since last burst
-                if current_time - self._last_burst_time > self._min_burst_gap:
-                    self._detect_burst(current_time, normalized_magnitude)
-                    self._last_burst_time = current_time
+    def _process_audio_batch(self, count: int) -> None:
+        """Process a batch of audio chunks for tone burst detection."""
+        # Measure the power of the tone bin in the window ending at every
+        # chunk and check which windows contain a tone burst
+        powers, hits = self._detect_tones(count)
+        
+        # Keep the tail of this batch as the start of the next windows
+        end = count * self._chunk_size
+        self._samples[:self._history_size] = self._samples[end:end + self._history_size]
+        
+        for i in np.flatnonzero(hits):
+            # Timestamp the middle of the window from the ADC capture time
+            # of the chunk that ends it
+            detection_time = (self._stream_time_offset + self._batch_adc_times[i] +
+                              (self._chunk_size - self._window_size * 0.5) / self._sample_rate)
             
-        except Exception as e:
-            self.logger.error(f"Error processing audio chunk: {e}")
+            # Check if enough time has passed since last burst
+            if detection_time - self._last_burst_time > self._min_burst_gap:
+                magnitude = math.sqrt(powers[i]) / self._window_gain
+                self._detect_burst(detection_time, magnitude)
+                self._last_burst_time = detection_time
+    
+    def _detect_tones(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the squared tone bin magnitude and threshold hits of the first count windows."""
+        batch = self._windows[:count]
+        powers = self._powers[:count]
+        hits = self._hits[:count]
+        
+        if HAVE_NUMBA:
+            # The kernel applies the window itself and runs without the GIL
+            detect_tones(batch, self._window, self._goertzel_coeff,
+                         self._threshold_sq, powers, hits)
+            return powers, hits
+        
+        if self._fft is not None:
+            # Without numba the per-sample loop is too slow, so read the bin
+            # from a real FFT, which stays in single precision
+            for i in range(count):
+                np.multiply(batch[i], self._window, out=self._fft_in)
+                self._fft()
+                c = self._fft_out[self._target_bin]
+                powers[i] = c.real * c.real + c.imag * c.imag
+        else:
+            # scipy.fft keeps float32 input in single precision (complex64),
+            # whereas numpy.fft before 2.0 promotes it to complex128
+            windowed = self._windowed[:count]
+            np.multiply(batch, self._window, out=windowed)
+            fft_data = scipy.fft.rfft(windowed, axis=1, overwrite_x=True, workers=1)
+            target = fft_data[:, self._target_bin]
+            np.add(target.real ** 2, target.imag ** 2, out=powers)
+        
+        np.greater(powers, self._threshold_sq, out=hits)
+        return powers, hits
     
     def _detect_burst(self, detection_time: float, magnitude: float) -> None:
         """Handle detected tone burst."""
-        try:
-            # Get PTP timestamp
-            ptp_time, system_time = self.ptp_time.get_timestamp()
+        # Batches are processed well after capture, so stamp the burst with
+        # the PTP time at detection rather than the current time
+        ptp_offset = self.ptp_time.calculate_offset()
+        if ptp_offset is not None:
+            system_time = detection_time
+            ptp_time = detection_time + ptp_offset
             
             # Calculate latency (difference between expected and actual burst time)
-            expected_burst_time = self._calculate_expected_burst_time()
-            if expected_burst_time is not None:
-                latency = (detection_time - expected_burst_time) * 1000  # Convert to ms
-                
-                # Store burst information
-                burst_info = {
-                    'ptp_time': ptp_time,
-                    'system_time': system_time,
-                    'detection_time': detection_time,
-                    'expected_time': expected_burst_time,
-                    'latency_ms': latency,
-                    'magnitude': magnitude
-                }
-                
-                self._detected_bursts.append(burst_info)
-                
-                # Send to InfluxDB
-                self._send_to_influxdb(burst_info)
-                
-                self.logger.debug(f"Tone burst detected: latency={latency:.2f}ms, magnitude={magnitude:.4f}")
-            
-        except Exception as e:
-            self.logger.error(f"Error handling detected burst: {e}")
-    
-    def _calculate_expected_burst_time(self) -> Optional[float]:
-        """Calculate the expected time of the next burst based on PTP timing."""
-        try:
-            ptp_time = self.ptp_time.get_ptp_time()
-            if ptp_time is None:
-                return None
+            expected_burst_time = self._calculate_expected_burst_time(ptp_time) - ptp_offset
+            latency = (detection_time - expected_burst_time) * 1000  # Convert to ms
             
-            # Calculate next burst time based on interval
-            next_burst = (ptp_time // self.config.audio.burst_interval + 1) * self.config.audio.burst_interval
+            # Store burst information
+            self._store_burst(ptp_time, system_time, detection_time,
+                              expected_burst_time, latency, magnitude)
             
-            # Convert PTP time to system time
-            ptp_offset = self.ptp_time.calculate_offset()
-            if ptp_offset is not None:
-                return next_burst - ptp_offset
+            # Send to InfluxDB
+            self._send_to_influxdb(ptp_time, system_time, detection_time, latency, magnitude)
             
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"Error calculating expected burst time: {e}")
-            return None
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Tone burst detected: latency=%.2fms, magnitude=%.4f", latency, magnitude)
+    
+    def _store_burst(self, ptp_time: float, system_time: float, detection_time: float,
+                     expected_time: float, latency_ms: float, magnitude: float) -> None:
+        """Store a detected burst, overwriting the oldest once the store is full."""
+        i = self._burst_count % self._burst_capacity
+        self._burst_ptp_time[i] = ptp_time
+        self._burst_system_time[i] = system_time
+        self._burst_detection_time[i] = detection_time
+        self._burst_expected_time[i] = expected_time
+        self._burst_latency_ms[i] = latency_ms
+        self._burst_magnitude[i] = magnitude
+        self._burst_count += 1
+    
+    def _calculate_expected_burst_time(self, ptp_time: float) -> float:
+        """Calculate the PTP time the burst detected at ptp_time was sent.
+        
+        This is the burst boundary nearest the detection, since the window
+        centre can fall slightly before the boundary of the burst it detects.
+        """
+        return round(ptp_time / self._burst_interval) * self._burst_interval
     
-    def _send_to_influxdb(self, burst_info: dict) -> None:
+    def _send_to_influxdb(self, ptp_time: float, system_time: float, detection_time: float,
+                          latency_ms: float, magnitude: float) -> None:
         """Send burst information to InfluxDB."""
         if not self._write_api:
             return
         
         try:
-            # Create InfluxDB point
-            point = Point("audio_latency") \
-                .field("latency_ms", burst_info['latency_ms']) \
-                .field("magnitude", burst_info['magnitude']) \
-                .field("ptp_time", burst_info['ptp_time']) \
-                .field("system_time", burst_info['system_time']) \
-                .tag("switch", self.config.network.switch_name) \
-                .tag("host", self.config.network.host_name) \
-                .tag("vlan", str(self.config.network.vlan_id)) \
-                .tag("ptp_sync", str(self.ptp_time.is_synchronized()))
+            # Build the line protocol record directly; only the sync tag,
+            # fields and timestamp change between bursts. The timestamp is
+            # the detection time, since batched points reach the server late.
+            record = (
+                f"{self._point_prefix},ptp_sync={self.ptp_time.is_synchronized()} "
+                f"latency_ms={latency_ms},magnitude={magnitude},"
+                f"ptp_time={ptp_time},system_time={system_time} "
+                f"{int(detection_time * 1e9)}"
+            )
             
-            # Write to InfluxDB
+            # Queue for the next batched write
             self._write_api.write(
-                bucket=self.config.influxdb.database,
-                record=point
+                bucket=self._bucket,
+                record=record
             )
             
         except Exception as e:
-            self.logger.error(f"Failed to send data to InfluxDB: {e}")
+            log.error(f"Failed to send data to InfluxDB: {e}")
     
     def _run(self) -> None:
-        """Main capture loop."""
-        try:
-            while self._running:
-                time.sleep(0.1)  # Small delay to prevent busy waiting
-                
-        except Exception as e:
-            self.logger.error(f"Error in capture loop: {e}")
+        """Main capture loop, processing chunks queued by the audio callback until stopped."""
+        stopping = False
+        while not stopping:
+            try:
+                count, stopping = self._collect_batch()
+                if count:
+                    self._process_audio_batch(count)
+            
+            except Exception as e:
+                # Log and keep consuming so one bad batch does not stop capture
+                log.error(f"Error in capture loop: {e}")
+    
+    def _collect_batch(self) -> Tuple[int, bool]:
+        """Append queued chunks to the sample buffer.
+        
+        Blocks until the batch is full or the stop sentinel arrives, and
+        returns the number of chunks collected and whether capture stopped.
+        """
+        count = 0
+        while count < self._batch_size:
+            item = self._frames.get()
+            if item is _STOP:
+                return count, True
+            
+            slot, adc_time = item
+            start = self._history_size + count * self._chunk_size
+            self._samples[start:start + self._chunk_size] = self._chunk_pool[slot]
+            self._batch_adc_times[count] = adc_time
+            count += 1
+        
+        return count, False
     
     def get_status(self) -> dict:
         """Get current status of the audio capture."""
@@ -292,10 +476,23 @@ class AudioCapture:
             'ptp_synchronized': self.ptp_time.is_synchronized(),
             'ptp_offset': self.ptp_time.calculate_offset(),
             'influxdb_connected': self._influx_client is not None,
-            'bursts_detected': len(self._detected_bursts),
-            'audio_stream_active': self._stream is not None and self._stream.is_active()
+            'bursts_detected': min(self._burst_count, self._burst_capacity),
+            'dropped_chunks': self._dropped_chunks,
+            'audio_stream_active': self._stream is not None and self._stream.active
         }
     
     def get_recent_bursts(self, count: int = 10) -> List[dict]:
         """Get recent burst detection data."""
-        return self._detected_bursts[-count:] if self._detected_bursts else []
+        count = min(count, self._burst_count, self._burst_capacity)
+        indices = np.arange(self._burst_count - count, self._burst_count) % self._burst_capacity
+        return [
+            {
+                'ptp_time': float(self._burst_ptp_time[i]),
+                'system_time': float(self._burst_system_time[i]),
+                'detection_time': float(self._burst_detection_time[i]),
+                'expected_time': float(self._burst_expected_time[i]),
+                'latency_ms': float(self._burst_latency_ms[i]),
+                'magnitude': float(self._burst_magnitude[i])
+            }
+            for i in indices
+        ]
@@ -0,0 +1,67 @@
+"""
+DSP kernels for PTPPing tone detection.
+"""
+
+import math
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+
+def _jit(signature=None, **options):
+    """Compile with numba when available, otherwise run as plain Python.
+
+    Giving a signature compiles the kernel at import time (or loads it from
+    the on-disk cache) rather than on its first call from the worker thread.
+    """
+    def decorator(func):
+        if numba is None:
+            return func
+        if signature is not None:
+            return numba.njit(signature, **options)(func)
+        return numba.njit(**options)(func)
+    return decorator
+
+
+def target_bin(window_size: int, tone_frequency: float, sample_rate: int) -> int:
+    """Get the index of the DFT bin closest to the tone frequency for an analysis window."""
+    return int(round(window_size * tone_frequency / sample_rate))
+
+
+def goertzel_coefficient(window_size: int, k: int) -> float:
+    """Calculate the Goertzel recurrence coefficient for DFT bin k of an analysis window."""
+    w = 2.0 * math.pi * k / window_size
+    return 2.0 * math.cos(w)
+
+
+@_jit('f8(f4[:], f4[:], f8)', cache=True, fastmath=True, nogil=True)
+def goertzel_power(samples, taper, coeff):
+    """Compute the squared magnitude of one DFT bin of the tapered samples (Goertzel)."""
+    s_prev = 0.0
+    s_prev2 = 0.0
+    for i in range(samples.shape[0]):
+        s = samples[i] * taper[i] + coeff * s_prev - s_prev2
+        s_prev2 = s_prev
+        s_prev = s
+
+    return max(s_prev * s_prev + s_prev2 * s_prev2 - coeff * s_prev * s_prev2, 0.0)
+
+
+@_jit('void(f4[:, :], f4[:], f8, f8, f8[:], b1[:])', cache=True, fastmath=True, nogil=True)
+def detect_tones(windows, taper, coeff, threshold_sq, out_powers, out_hits):
+    """Compute the Goertzel power of each analysis window row and flag rows above threshold_sq.
+
+    Each row is weighted by taper (the Hann window) before the recurrence.
+
+    The kernel is serial: a batch is too little work for a thread pool, and
+    several capture threads must be able to run it at once without the GIL,
+    which numba's workqueue threading layer does not allow for parallel kernels.
+    """
+    for c in range(windows.shape[0]):
+        power = goertzel_power(windows[c], taper, coeff)
+        out_powers[c] = power
+        out_hits[c] = power > threshold_sq
@@ -3,14 +3,24 @@ Configuration management for PTPPing.
 """
 
 import logging
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
-import toml
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+    import toml
 
+# Configuration is immutable once loaded; slots need Python 3.10+
+_DATACLASS_OPTIONS = {'frozen': True}
+if sys.version_info >= (3, 10):
+    _DATACLASS_OPTIONS['slots'] = True
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class PTPConfig:
     """PTP configuration settings."""
     interface: str
@@ -18,7 +28,7 @@ class PTPConfig:
     priority: int
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AudioConfig:
     """Audio configuration settings."""
     sample_rate: int
@@ -29,7 +39,7 @@ class AudioConfig:
     loopback_device: str
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class NetworkConfig:
     """Network configuration settings."""
     switch_name: str
@@ -37,7 +47,7 @@ class NetworkConfig:
     vlan_id: int
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class InfluxDBConfig:
     """InfluxDB configuration settings."""
     url: str
@@ -47,14 +57,18 @@ class InfluxDBConfig:
     retention_days: int
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class GrafanaConfig:
     """Grafana configuration settings."""
     url: str
     api_key: str
+    pool_size: int = 16
+    concurrency: int = 10
+    async_provisioning: bool = False
+    status_ttl: float = 5.0
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LoggingConfig:
     """Logging configuration settings."""
     level: str
@@ -63,7 +77,7 @@ class LoggingConfig:
     backup_count: int
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class MonitoringConfig:
     """Monitoring configuration settings."""
     system_metrics: bool
@@ -72,7 +86,7 @@ class MonitoringConfig:
     webhook_url: str
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Config:
     """Main configuration class."""
     ptp: PTPConfig
@@ -87,7 +101,11 @@ class Config:
     def from_file(cls, config_path: Path) -> 'Config':
         """Load configuration from TOML file."""
         try:
-            config_data = toml.load(config_path)
+            if tomllib is not None:
+                with open(config_path, 'rb') as f:
+                    config_data = tomllib.load(f)
+            else:
+                config_data = toml.load(config_path)
             
             # Validate and create configuration objects
             ptp = PTPConfig(
@@ -121,7 +139,11 @@ class Config:
             
             grafana = GrafanaConfig(
                 url=config_data['grafana']['url'],
-                api_key=config_data['grafana']['api_key']
+                api_key=config_data['grafana']['api_key'],
+                pool_size=config_data['grafana'].get('pool_size', 16),
+                concurrency=config_data['grafana'].get('concurrency', 10),
+                async_provisioning=config_data['grafana'].get('async_provisioning', False),
+                status_ttl=config_data['grafana'].get('status_ttl', 5.0)
             )
             
             logging_config = LoggingConfig(
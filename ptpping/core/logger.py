@@ -2,17 +2,28 @@
 Logging configuration for PTPPing.
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from typing import Optional
 
 from .config import LoggingConfig
 
+# Listener writing queued records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
 
 def setup_logging(config: LoggingConfig, level: int = logging.INFO) -> None:
-    """Setup logging configuration."""
+    """Setup logging configuration.
+    
+    Records are passed through a queue to a listener thread, so logging from
+    the capture path never blocks on console or file I/O.
+    """
+    global _queue_listener
+    
     # Create formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -27,11 +38,18 @@ def setup_logging(config: LoggingConfig, level: int = logging.INFO) -> None:
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+    
+    handlers = []
+    file_error = None
+    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (if configured)
     if config.file:
@@ -46,10 +64,19 @@ def setup_logging(config: LoggingConfig, level: int = logging.INFO) -> None:
             )
             file_handler.setLevel(level)
             file_handler.setFormatter(formatter)
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
             
         except Exception as e:
-            logging.warning(f"Failed to setup file logging: {e}")
+            file_error = e
+    
+    # Queue handler on the root logger, drained by a listener thread
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    
+    if file_error is not None:
+        logging.warning(f"Failed to setup file logging: {file_error}")
     
     # Set specific logger levels
     logging.getLogger('ptpping').setLevel(level)
@@ -60,6 +87,15 @@ def setup_logging(config: LoggingConfig, level: int = logging.INFO) -> None:
     logging.getLogger('influxdb').setLevel(logging.WARNING)
 
 
+def _stop_queue_listener() -> None:
+    """Flush queued log records at interpreter exit."""
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+atexit.register(_stop_queue_listener)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
     return logging.getLogger(f"ptpping.{name}")
@@ -3,12 +3,33 @@ PTP time management for PTPPing.
 """
 
 import logging
+import os
 import subprocess
+import threading
 import time
+from pathlib import Path
 from typing import Optional, Tuple
 
 from .config import PTPConfig
 
+# Clock type bits of a dynamic POSIX clock id (see clock_getres(2))
+_CLOCKFD = 3
+
+
+def _is_running(name: str) -> bool:
+    """Check whether a process with the given command name is running, from /proc."""
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/comm') as f:
+                if f.read().strip() == name:
+                    return True
+        except OSError:
+            # Process exited while scanning
+            continue
+    return False
+
 
 class PTPTimeManager:
     """Manages PTP time synchronization and provides timestamping functions."""
@@ -17,51 +38,70 @@ class PTPTimeManager:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self._ptp_sync = False
-        self._last_sync_check = 0
         self._sync_check_interval = 60  # Check sync status every 60 seconds
         
+        # Clock id for reading PTP time directly, without spawning phc_ctl
+        self._phc_fd = None
+        self._ptp_clock_id = self._open_ptp_clock()
+        
+        # Sync status is checked once now, then refreshed in the background so
+        # that timestamping callers only read the cached flag and never wait
+        # on pmc
+        self._check_ptp_sync()
+        self._sync_stop = threading.Event()
+        self._sync_thread = threading.Thread(target=self._refresh_ptp_sync, daemon=True)
+        self._sync_thread.start()
+    
+    def _refresh_ptp_sync(self) -> None:
+        """Re-check the PTP sync status every check interval until closed."""
+        while not self._sync_stop.wait(self._sync_check_interval):
+            self._check_ptp_sync()
+
+    def _open_ptp_clock(self) -> Optional[int]:
+        """Open the PTP hardware clock of the configured interface as a POSIX clock."""
+        device = self._find_phc_device()
+        if device is not None:
+            try:
+                self._phc_fd = os.open(device, os.O_RDONLY)
+                self.logger.debug(f"Reading PTP time from {device}")
+                # Dynamic POSIX clock id for the open file descriptor (FD_TO_CLOCKID)
+                return (~self._phc_fd << 3) | _CLOCKFD
+            except OSError as e:
+                self.logger.warning(f"Failed to open PTP hardware clock {device}: {e}")
+        
+        # CLOCK_TAI follows the PHC when phc2sys disciplines the system clock
+        clock_tai = getattr(time, 'CLOCK_TAI', None)
+        if clock_tai is not None:
+            self.logger.warning("PTP hardware clock unavailable, using CLOCK_TAI")
+        return clock_tai
+    
+    def _find_phc_device(self) -> Optional[str]:
+        """Find the PTP hardware clock device for the configured interface."""
+        if self.config.interface.startswith('/dev/ptp'):
+            return self.config.interface
+        
+        ptp_dir = Path('/sys/class/net') / self.config.interface / 'device' / 'ptp'
+        try:
+            for entry in sorted(ptp_dir.iterdir()):
+                return f"/dev/{entry.name}"
+        except OSError:
+            pass
+        
+        return None
+    
     def get_ptp_time(self) -> Optional[float]:
         """Get current PTP time in seconds since epoch."""
-        try:
-            # Check if we need to verify PTP sync status
-            current_time = time.time()
-            if current_time - self._last_sync_check > self._sync_check_interval:
-                self._check_ptp_sync()
-                self._last_sync_check = current_time
-            
-            if not self._ptp_sync:
-                self.logger.warning("PTP not synchronized, using system time")
-                return time.time()
-            
-            # Get PTP time from system
-            result = subprocess.run(
-                ['phc_ctl', '-d', self.config.interface, 'get'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode == 0:
-                # Parse PTP time from output
-                # Expected format: "phc_ctl: clock time is 1234567890.123456789"
-                for line in result.stdout.splitlines():
-                    if 'clock time is' in line:
-                        try:
-                            ptp_time_str = line.split('clock time is')[-1].strip()
-                            ptp_time = float(ptp_time_str)
-                            return ptp_time
-                        except ValueError:
-                            self.logger.error(f"Failed to parse PTP time: {line}")
-                            break
-            
-            # Fallback to system time if PTP time unavailable
-            self.logger.warning("Failed to get PTP time, using system time")
+        if not self._ptp_sync:
+            self.logger.warning("PTP not synchronized, using system time")
             return time.time()
-            
-        except subprocess.TimeoutExpired:
-            self.logger.error("Timeout getting PTP time")
+        
+        if self._ptp_clock_id is None:
+            self.logger.warning("Failed to get PTP time, using system time")
             return time.time()
-        except Exception as e:
+        
+        try:
+            return time.clock_gettime(self._ptp_clock_id)
+        except OSError as e:
             self.logger.error(f"Error getting PTP time: {e}")
             return time.time()
     
@@ -69,14 +109,7 @@ class PTPTimeManager:
         """Check PTP synchronization status."""
         try:
             # Check if PTP daemon is running
-            result = subprocess.run(
-                ['pgrep', 'ptp4l'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode != 0:
+            if not _is_running('ptp4l'):
                 self.logger.warning("PTP daemon (ptp4l) not running")
                 self._ptp_sync = False
                 return
@@ -130,9 +163,15 @@ class PTPTimeManager:
         return None
     
     def is_synchronized(self) -> bool:
-        """Check if PTP is currently synchronized."""
-        current_time = time.time()
-        if current_time - self._last_sync_check > self._sync_check_interval:
-            self._check_ptp_sync()
-            self._last_sync_check = current_time
+        """Check if PTP is currently synchronized, as of the last sync check."""
         return self._ptp_sync
+    
+    def close(self) -> None:
+        """Stop the sync refresher and close the PTP hardware clock device."""
+        self._sync_stop.set()
+        self._sync_thread.join(timeout=10)
+        
+        if self._phc_fd is not None:
+            os.close(self._phc_fd)
+            self._phc_fd = None
+            self._ptp_clock_id = None
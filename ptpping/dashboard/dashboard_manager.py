@@ -3,44 +3,180 @@ Dashboard manager for PTPPing.
 Handles Grafana dashboard provisioning and management.
 """
 
-import json
+import asyncio
+import hashlib
 import logging
+import os
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    
+    json_loads = orjson.loads
+    
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+    
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HAVE_HTTP2 = True
+except ImportError:
+    HAVE_HTTP2 = False
 
 from ..core.config import Config
 
+# Templates and HTTP adapters are shared by every DashboardManager in the process
+_TEMPLATES_CACHE: Optional[Dict[str, Dict[str, Any]]] = None
+_TEMPLATES_LOCK = threading.Lock()
+_ADAPTERS: Dict[int, HTTPAdapter] = {}
+_ADAPTERS_LOCK = threading.Lock()
+
+
+def _shared_adapter(pool_size: int) -> HTTPAdapter:
+    """Get the process-wide retrying HTTP adapter for a connection pool size."""
+    adapter = _ADAPTERS.get(pool_size)
+    if adapter is None:
+        with _ADAPTERS_LOCK:
+            adapter = _ADAPTERS.get(pool_size)
+            if adapter is None:
+                retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504])
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+                _ADAPTERS[pool_size] = adapter
+    return adapter
+
 
 class DashboardManager:
     """Manages Grafana dashboards for PTPPing."""
     
+    # Record of the last upload of each dashboard, kept across restarts in
+    # the state directory created by install.sh
+    _UPLOADS_FILE = Path("/var/lib/ptpping/dashboard_hashes.json")
+    
+    # Grafana API paths and the search listing every dashboard, shared by
+    # the threaded and async provisioning paths
+    _SAVE_PATH = "/api/dashboards/db"
+    _SEARCH_PATH = "/api/search"
+    _SEARCH_PARAMS = {'type': 'dash-db'}
+    
+    # Template placeholders substituted with configuration values
+    _PLACEHOLDER_RE = re.compile(
+        rb'\{\{(INFLUXDB_URL|INFLUXDB_DATABASE|INFLUXDB_ORG|SWITCH_NAME|HOST_NAME|VLAN_ID)\}\}'
+    )
+    
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
         self._running = False
-        self._headers = {
-            'Authorization': f'Bearer {config.grafana.api_key}',
-            'Content-Type': 'application/json'
-        }
+        self._headers = self._build_headers()
+        
+        # Pooled HTTP session reused for every Grafana call
+        self._session = self._create_session()
         
         # Dashboard templates
         self._dashboard_templates = self._load_dashboard_templates()
+        
+        # Placeholder values, fixed for the lifetime of the configuration
+        self._placeholder_values = self._build_placeholder_values()
+        
+        # Templates customized for the current configuration, rendered on
+        # first use and reused until the configuration changes
+        self._rendered_templates: Optional[Dict[str, Dict[str, Any]]] = None
+        
+        # Existing dashboards by title, from a single Grafana search
+        self._dashboard_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dashboard_index_time = 0.0
+        self._dashboard_index_ttl = 60.0  # Seconds
+        self._dashboard_index_lock = threading.Lock()
+        
+        # Content hash, UID and Grafana version of each dashboard as last
+        # uploaded, by Grafana URL and template name
+        self._last_uploads: Dict[str, Dict[str, Any]] = self._load_last_uploads()
+        
+        # Last Grafana status and the monotonic time it was fetched
+        self._status_cache: Tuple[Optional[Dict[str, Any]], float] = (None, 0.0)
+    
+    def _build_headers(self) -> Dict[str, str]:
+        """Build the Grafana API request headers."""
+        return {
+            'Authorization': f'Bearer {self.config.grafana.api_key}',
+            'Content-Type': 'application/json'
+        }
+    
+    def _build_placeholder_values(self) -> Dict[bytes, bytes]:
+        """Build the UTF-8 values substituted for template placeholders."""
+        config = self.config
+        return {
+            b'INFLUXDB_URL': config.influxdb.url.encode(),
+            b'INFLUXDB_DATABASE': config.influxdb.database.encode(),
+            b'INFLUXDB_ORG': config.influxdb.organization.encode(),
+            b'SWITCH_NAME': config.network.switch_name.encode(),
+            b'HOST_NAME': config.network.host_name.encode(),
+            b'VLAN_ID': str(config.network.vlan_id).encode()
+        }
+    
+    def _create_session(self) -> requests.Session:
+        """Create a pooled HTTP session for Grafana API calls."""
+        session = requests.Session()
+        session.headers.update(self._headers)
+        
+        adapter = _shared_adapter(self.config.grafana.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        
+        return session
+    
+    def _load_dashboard_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Load dashboard templates, reading the files once per process."""
+        global _TEMPLATES_CACHE
+        
+        if _TEMPLATES_CACHE is None:
+            with _TEMPLATES_LOCK:
+                if _TEMPLATES_CACHE is None:
+                    _TEMPLATES_CACHE = self._read_dashboard_templates()
+        
+        return _TEMPLATES_CACHE
     
-    def _load_dashboard_templates(self) -> Dict[str, Any]:
-        """Load dashboard templates from JSON files."""
+    def _read_dashboard_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Read dashboard templates from JSON files.
+        
+        Each template is kept both parsed and as the raw file bytes, with a
+        flag telling whether it contains any placeholders to substitute.
+        Templates are shared between managers, so they are never modified.
+        """
         templates = {}
         templates_dir = Path(__file__).parent / "templates"
         
         if templates_dir.exists():
             for template_file in templates_dir.glob("*.json"):
                 try:
-                    with open(template_file, 'r') as f:
-                        template_name = template_file.stem
-                        templates[template_name] = json.load(f)
+                    template_name = template_file.stem
+                    raw = template_file.read_bytes()
+                    
+                    templates[template_name] = {
+                        'obj': json_loads(raw),
+                        'raw': raw,
+                        'has_placeholders': b'{{' in raw
+                    }
                     self.logger.debug(f"Loaded dashboard template: {template_name}")
                 except Exception as e:
                     self.logger.error(f"Failed to load template {template_file}: {e}")
@@ -59,6 +195,9 @@ class DashboardManager:
             # Test Grafana connection
             self._test_connection()
             
+            # Render templates once for this configuration
+            self._rendered_templates = self._customize_templates()
+            
             # Provision dashboards
             self._provision_dashboards()
             
@@ -71,14 +210,15 @@ class DashboardManager:
     def stop(self) -> None:
         """Stop the dashboard manager."""
         self._running = False
+        # The session's adapter is shared with other managers, so its
+        # connection pool is left open
         self.logger.info("Dashboard manager stopped")
     
     def _test_connection(self) -> None:
         """Test connection to Grafana."""
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self.config.grafana.url}/api/health",
-                headers=self._headers,
                 timeout=10
             )
             
@@ -93,138 +233,360 @@ class DashboardManager:
             raise
     
     def _provision_dashboards(self) -> None:
-        """Provision all dashboard templates."""
-        for template_name, template in self._dashboard_templates.items():
+        """Provision all dashboard templates concurrently."""
+        if not self._dashboard_templates:
+            return
+        
+        if self.config.grafana.async_provisioning:
+            if httpx is not None:
+                asyncio.run(self._provision_dashboards_async())
+                return
+            self.logger.warning("httpx not installed, falling back to threaded dashboard provisioning")
+        
+        dashboards = self._get_rendered_templates()
+        if not dashboards:
+            return
+        
+        max_workers = min(self.config.grafana.concurrency, len(dashboards))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._provision_dashboard, name, dashboard_data): name
+                for name, dashboard_data in dashboards.items()
+            }
+            
+            for future, template_name in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to provision dashboard {template_name}: {e}")
+        
+        self._save_last_uploads()
+    
+    def _is_still_uploaded(self, record: Dict[str, Any]) -> bool:
+        """Check whether Grafana still holds a dashboard as last uploaded."""
+        try:
+            response = self._session.get(
+                f"{self.config.grafana.url}{self._dashboard_path(record['uid'])}",
+                timeout=10
+            )
+            return self._is_as_uploaded(record, response)
+        except Exception as e:
+            self.logger.debug(f"Failed to look up dashboard {record['uid']}: {e}")
+            return False
+    
+    def _customize_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Customize every dashboard template, skipping any that fail."""
+        dashboards = {}
+        for name, template in self._dashboard_templates.items():
             try:
-                self._provision_dashboard(template_name, template)
+                dashboards[name] = self._customize_template(template)
             except Exception as e:
-                self.logger.error(f"Failed to provision dashboard {template_name}: {e}")
+                self.logger.error(f"Failed to customize dashboard {name}: {e}")
+        
+        return dashboards
     
-    def _provision_dashboard(self, name: str, template: Dict[str, Any]) -> None:
-        """Provision a single dashboard."""
+    def _get_rendered_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Get the templates customized for the current configuration."""
+        if self._rendered_templates is None:
+            self._rendered_templates = self._customize_templates()
+        return self._rendered_templates
+    
+    def _provision_dashboard(self, name: str, dashboard_data: Dict[str, Any]) -> None:
+        """Provision a single customized dashboard."""
         try:
-            # Customize template with configuration
-            customized_template = self._customize_template(template)
+            # Skip dashboards that Grafana still holds as last uploaded
+            new_hash = self._dashboard_hash(dashboard_data)
+            record = self._unchanged_upload(name, new_hash)
+            if record is not None and self._is_still_uploaded(record):
+                self.logger.debug(f"Dashboard unchanged: {name}")
+                return
             
             # Check if dashboard exists
             existing_dashboard = self._get_dashboard_by_name(name)
             
             if existing_dashboard:
                 # Update existing dashboard
-                self._update_dashboard(existing_dashboard['id'], customized_template)
-                self.logger.info(f"Updated dashboard: {name}")
+                result = self._update_dashboard(existing_dashboard['id'], dashboard_data)
             else:
                 # Create new dashboard
-                self._create_dashboard(customized_template)
-                self.logger.info(f"Created dashboard: {name}")
+                result = self._create_dashboard(dashboard_data)
+            
+            self._finish_upload(name, new_hash, result, existing_dashboard is not None)
                 
         except Exception as e:
             self.logger.error(f"Failed to provision dashboard {name}: {e}")
             raise
     
-    def _customize_template(self, template: Dict[str, Any]) -> Dict[str, Any]:
-        """Customize dashboard template with configuration values."""
-        customized = template.copy()
-        
-        # Replace placeholders with actual values
-        template_str = json.dumps(customized)
-        
-        # Replace common placeholders
-        replacements = {
-            '{{INFLUXDB_URL}}': self.config.influxdb.url,
-            '{{INFLUXDB_DATABASE}}': self.config.influxdb.database,
-            '{{INFLUXDB_ORG}}': self.config.influxdb.organization,
-            '{{SWITCH_NAME}}': self.config.network.switch_name,
-            '{{HOST_NAME}}': self.config.network.host_name,
-            '{{VLAN_ID}}': str(self.config.network.vlan_id)
+    async def _provision_dashboards_async(self) -> None:
+        """Provision all dashboard templates over a shared async HTTP client.
+        
+        With HTTP/2 available, every request is multiplexed over the same
+        connection instead of one connection per worker thread.
+        """
+        dashboards = self._get_rendered_templates()
+        if not dashboards:
+            return
+        
+        limits = httpx.Limits(max_connections=self.config.grafana.pool_size)
+        async with httpx.AsyncClient(base_url=self.config.grafana.url,
+                                     http2=HAVE_HTTP2,
+                                     limits=limits,
+                                     headers=self._headers,
+                                     timeout=30) as client:
+            index = await self._load_dashboard_index_async(client)
+            
+            names = list(dashboards)
+            results = await asyncio.gather(
+                *[self._provision_dashboard_async(client, name, dashboards[name], index.get(name))
+                  for name in names],
+                return_exceptions=True
+            )
+        
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to provision dashboard {name}: {result}")
+        
+        self._save_last_uploads()
+        
+        # Dashboards may have been created, so the threaded index is stale
+        self._invalidate_dashboard_index()
+    
+    async def _is_still_uploaded_async(self, client: "httpx.AsyncClient", record: Dict[str, Any]) -> bool:
+        """Check whether Grafana still holds a dashboard as last uploaded."""
+        try:
+            response = await client.get(self._dashboard_path(record['uid']), timeout=10)
+            return self._is_as_uploaded(record, response)
+        except Exception as e:
+            self.logger.debug(f"Failed to look up dashboard {record['uid']}: {e}")
+            return False
+    
+    async def _load_dashboard_index_async(self, client: "httpx.AsyncClient") -> Dict[str, Dict[str, Any]]:
+        """Fetch all dashboards from Grafana in one search, indexed by title."""
+        try:
+            response = await client.get(self._SEARCH_PATH, params=self._SEARCH_PARAMS, timeout=10)
+            
+            if response.status_code == 200:
+                return self._index_from_hits(response.json())
+            
+            self.logger.error(f"Failed to search dashboards: {response.status_code}")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to search dashboards: {e}")
+        
+        return {}
+    
+    async def _provision_dashboard_async(self, client: "httpx.AsyncClient", name: str,
+                                         dashboard_data: Dict[str, Any],
+                                         existing_dashboard: Optional[Dict[str, Any]]) -> None:
+        """Provision a single customized dashboard with the async HTTP client."""
+        # Skip dashboards that Grafana still holds as last uploaded
+        new_hash = self._dashboard_hash(dashboard_data)
+        record = self._unchanged_upload(name, new_hash)
+        if record is not None and await self._is_still_uploaded_async(client, record):
+            self.logger.debug(f"Dashboard unchanged: {name}")
+            return
+        
+        updating = existing_dashboard is not None
+        response = await client.post(self._SAVE_PATH, json=self._save_payload(dashboard_data, updating))
+        result = self._save_result(response, 'update' if updating else 'create')
+        
+        self._finish_upload(name, new_hash, result, updating)
+    
+    @staticmethod
+    def _dashboard_path(uid: str) -> str:
+        """Get the API path of a dashboard by UID."""
+        return f"/api/dashboards/uid/{uid}"
+    
+    @staticmethod
+    def _index_from_hits(hits: Any) -> Dict[str, Dict[str, Any]]:
+        """Index Grafana dashboard search hits by title."""
+        return {d['title']: d for d in hits if 'title' in d}
+    
+    @staticmethod
+    def _save_payload(dashboard_data: Dict[str, Any], overwrite: bool) -> Dict[str, Any]:
+        """Build the body of a dashboard save request.
+        
+        No version is sent; overwrite replaces whatever version is stored,
+        which saves looking up the current version of every dashboard.
+        """
+        return {
+            'dashboard': dashboard_data,
+            'overwrite': overwrite
         }
+    
+    @staticmethod
+    def _save_result(response: Any, action: str) -> Dict[str, Any]:
+        """Get Grafana's result from a dashboard save response, raising if it failed."""
+        if response.status_code != 200:
+            raise Exception(f"Failed to {action} dashboard: {response.status_code}")
+        return response.json()
+    
+    def _finish_upload(self, name: str, new_hash: str, result: Dict[str, Any], updated: bool) -> None:
+        """Record and log a successful dashboard upload."""
+        self._record_upload(name, new_hash, result)
+        self.logger.info(f"{'Updated' if updated else 'Created'} dashboard: {name}")
+    
+    @staticmethod
+    def _dashboard_hash(dashboard_data: Dict[str, Any]) -> str:
+        """Hash the content of a customized dashboard."""
+        return hashlib.blake2b(json_dumps(dashboard_data).encode(), digest_size=16).hexdigest()
+    
+    def _upload_key(self, name: str) -> str:
+        """Key the upload record of a dashboard by Grafana server and template."""
+        return f"{self.config.grafana.url}|{name}"
+    
+    def _unchanged_upload(self, name: str, new_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the last upload of a dashboard if it had the same content."""
+        record = self._last_uploads.get(self._upload_key(name))
+        if isinstance(record, dict) and record.get('hash') == new_hash and record.get('uid'):
+            return record
+        return None
+    
+    @staticmethod
+    def _is_as_uploaded(record: Dict[str, Any], response: Any) -> bool:
+        """Check a Grafana dashboard lookup against the record of its last upload.
         
-        for placeholder, value in replacements.items():
-            template_str = template_str.replace(placeholder, value)
+        Grafana bumps the version on every save, so a matching version means
+        nobody has edited or replaced the dashboard since.
+        """
+        return (response.status_code == 200 and
+                response.json().get('dashboard', {}).get('version') == record.get('version'))
+    
+    def _record_upload(self, name: str, new_hash: str, result: Dict[str, Any]) -> None:
+        """Remember the UID and version Grafana saved an uploaded dashboard as."""
+        if result.get('uid') and result.get('version') is not None:
+            self._last_uploads[self._upload_key(name)] = {
+                'hash': new_hash,
+                'uid': result['uid'],
+                'version': result['version']
+            }
+    
+    def _load_last_uploads(self) -> Dict[str, Dict[str, Any]]:
+        """Load the dashboard upload records saved by a previous run."""
+        try:
+            uploads = json_loads(self._UPLOADS_FILE.read_bytes())
+            return uploads if isinstance(uploads, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable dashboard hashes {self._UPLOADS_FILE}: {e}")
+            return {}
+    
+    def _save_last_uploads(self) -> None:
+        """Save the dashboard upload records for the next run."""
+        if not self._UPLOADS_FILE.parent.is_dir():
+            # Not installed, so there is no state directory to keep them in
+            return
+        
+        try:
+            # Write to a temporary file and move it into place, so a crash
+            # never leaves a truncated file behind
+            tmp_path = self._UPLOADS_FILE.with_name(f".{self._UPLOADS_FILE.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json_dumps(self._last_uploads))
+            os.replace(tmp_path, self._UPLOADS_FILE)
+        except Exception as e:
+            self.logger.warning(f"Failed to save dashboard hashes: {e}")
+    
+    def _customize_template(self, template: Dict[str, Any]) -> Dict[str, Any]:
+        """Customize dashboard template with configuration values.
+        
+        Templates without placeholders return the loaded object itself, so
+        callers must treat the result as read-only.
+        """
+        if not template['has_placeholders']:
+            return template['obj']
+        
+        # Replace all placeholders in one pass over the raw template bytes
+        template_bytes = self._PLACEHOLDER_RE.sub(
+            lambda m: self._placeholder_values[m.group(1)],
+            template['raw']
+        )
         
-        return json.loads(template_str)
+        return json_loads(template_bytes)
     
     def _get_dashboard_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """Get dashboard by name from Grafana."""
+        """Get dashboard by name from the cached Grafana dashboard index."""
+        with self._dashboard_index_lock:
+            now = time.monotonic()
+            if (self._dashboard_index is None or
+                    now - self._dashboard_index_time > self._dashboard_index_ttl):
+                self._dashboard_index = self._load_dashboard_index()
+                self._dashboard_index_time = now
+            
+            index = self._dashboard_index
+        
+        if index is None:
+            return None
+        return index.get(name)
+    
+    def _load_dashboard_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Fetch all dashboards from Grafana in one search, indexed by title."""
         try:
-            response = requests.get(
-                f"{self.config.grafana.url}/api/search",
-                headers=self._headers,
-                params={'query': name},
+            response = self._session.get(
+                f"{self.config.grafana.url}{self._SEARCH_PATH}",
+                params=self._SEARCH_PARAMS,
                 timeout=10
             )
             
             if response.status_code == 200:
-                dashboards = response.json()
-                for dashboard in dashboards:
-                    if dashboard.get('title') == name:
-                        return dashboard
+                return self._index_from_hits(response.json())
             
+            self.logger.error(f"Failed to search dashboards: {response.status_code}")
             return None
             
         except Exception as e:
-            self.logger.error(f"Failed to get dashboard {name}: {e}")
+            self.logger.error(f"Failed to search dashboards: {e}")
             return None
     
-    def _create_dashboard(self, dashboard_data: Dict[str, Any]) -> None:
-        """Create a new dashboard in Grafana."""
+    def _invalidate_dashboard_index(self) -> None:
+        """Drop the cached dashboard index so the next lookup searches again."""
+        with self._dashboard_index_lock:
+            self._dashboard_index = None
+    
+    def _create_dashboard(self, dashboard_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new dashboard in Grafana, returning Grafana's save result."""
         try:
-            payload = {
-                'dashboard': dashboard_data,
-                'overwrite': False
-            }
-            
-            response = requests.post(
-                f"{self.config.grafana.url}/api/dashboards/db",
-                headers=self._headers,
-                json=payload,
+            response = self._session.post(
+                f"{self.config.grafana.url}{self._SAVE_PATH}",
+                json=self._save_payload(dashboard_data, False),
                 timeout=30
             )
             
-            if response.status_code != 200:
-                raise Exception(f"Failed to create dashboard: {response.status_code}")
+            result = self._save_result(response, 'create')
+            
+            self._invalidate_dashboard_index()
+            return result
                 
         except Exception as e:
             self.logger.error(f"Failed to create dashboard: {e}")
             raise
     
-    def _update_dashboard(self, dashboard_id: int, dashboard_data: Dict[str, Any]) -> None:
-        """Update an existing dashboard in Grafana."""
+    def _update_dashboard(self, dashboard_id: int, dashboard_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Update an existing dashboard in Grafana, returning Grafana's save result."""
         try:
-            # Get current dashboard version
-            response = requests.get(
-                f"{self.config.grafana.url}/api/dashboards/uid/{dashboard_data.get('uid', '')}",
-                headers=self._headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                current_dashboard = response.json()['dashboard']
-                dashboard_data['version'] = current_dashboard['version'] + 1
-            else:
-                dashboard_data['version'] = 1
-            
-            payload = {
-                'dashboard': dashboard_data,
-                'overwrite': True
-            }
-            
-            response = requests.post(
-                f"{self.config.grafana.url}/api/dashboards/db",
-                headers=self._headers,
-                json=payload,
+            response = self._session.post(
+                f"{self.config.grafana.url}{self._SAVE_PATH}",
+                json=self._save_payload(dashboard_data, True),
                 timeout=30
             )
             
-            if response.status_code != 200:
-                raise Exception(f"Failed to update dashboard: {response.status_code}")
+            return self._save_result(response, 'update')
                 
         except Exception as e:
             self.logger.error(f"Failed to update dashboard: {e}")
             raise
     
     def get_dashboard_status(self) -> Dict[str, Any]:
-        """Get status of all dashboards."""
+        """Get status of all dashboards.
+        
+        Grafana is queried at most once per grafana.status_ttl seconds;
+        polls in between are answered from the last result.
+        """
+        cached_status, cached_time = self._status_cache
+        if (cached_status is not None and
+                time.monotonic() - cached_time < self.config.grafana.status_ttl):
+            return {**cached_status, 'running': self._running}
+        
         status = {
             'running': self._running,
             'grafana_connected': False,
@@ -234,9 +596,8 @@ class DashboardManager:
         
         try:
             # Test connection
-            response = requests.get(
+            response = self._session.get(
                 f"{self.config.grafana.url}/api/health",
-                headers=self._headers,
                 timeout=5
             )
             
@@ -244,10 +605,9 @@ class DashboardManager:
                 status['grafana_connected'] = True
                 
                 # Count provisioned dashboards
-                response = requests.get(
-                    f"{self.config.grafana.url}/api/search",
-                    headers=self._headers,
-                    params={'type': 'dash-db'},
+                response = self._session.get(
+                    f"{self.config.grafana.url}{self._SEARCH_PATH}",
+                    params=self._SEARCH_PARAMS,
                     timeout=10
                 )
                 
@@ -259,12 +619,30 @@ class DashboardManager:
         except Exception as e:
             self.logger.debug(f"Error getting dashboard status: {e}")
         
-        return status
+        self._status_cache = (status, time.monotonic())
+        return dict(status)
+    
+    def reload_config(self, config: Config) -> None:
+        """Switch to a new configuration.
+        
+        Rendered templates and cached Grafana state are dropped, so the next
+        provisioning renders the templates again with the new values.
+        """
+        self.config = config
+        self._headers = self._build_headers()
+        self._session = self._create_session()
+        self._placeholder_values = self._build_placeholder_values()
+        self._rendered_templates = None
+        self._status_cache = (None, 0.0)
+        self._invalidate_dashboard_index()
+        
+        self.logger.info("Dashboard manager configuration reloaded")
     
     def refresh_dashboards(self) -> None:
         """Refresh all dashboards."""
         try:
             self._provision_dashboards()
+            self._status_cache = (None, 0.0)
             self.logger.info("Dashboards refreshed successfully")
         except Exception as e:
             self.logger.error(f"Failed to refresh dashboards: {e}")
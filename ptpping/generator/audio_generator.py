@@ -3,7 +3,10 @@ Audio generator for PTPPing.
 Generates 440 Hz tone bursts synchronized to PTP time.
 """
 
+import functools
+import hashlib
 import logging
+import os
 import subprocess
 import threading
 import time
@@ -17,6 +20,33 @@ from ..core.config import Config
 from ..core.ptp_time import PTPTimeManager
 
 
+@functools.lru_cache(maxsize=8)
+def _build_tone(sample_rate: int, duration: float, frequency: float, fade_ms: float = 10) -> np.ndarray:
+    """Build a faded 16-bit sine tone burst.
+    
+    The result is cached and shared between callers, so it is read-only.
+    """
+    # Calculate samples for the burst duration
+    samples = int(sample_rate * duration)
+    
+    # Generate sine wave in place in single precision
+    tone = np.arange(samples, dtype=np.float32)
+    np.multiply(tone, np.float32(2 * np.pi * frequency / sample_rate), out=tone)
+    np.sin(tone, out=tone)
+    
+    # Apply fade in/out to avoid clicks
+    fade_samples = min(int(fade_ms / 1000 * sample_rate), samples)
+    if fade_samples > 0:
+        tone[:fade_samples] *= np.linspace(0, 1, fade_samples, dtype=np.float32)
+        tone[-fade_samples:] *= np.linspace(1, 0, fade_samples, dtype=np.float32)
+    
+    # Normalize to 16-bit range
+    np.multiply(tone, 32767, out=tone)
+    tone = tone.astype(np.int16)
+    tone.setflags(write=False)
+    return tone
+
+
 class AudioGenerator:
     """Generates audio tone bursts synchronized to PTP time."""
     
@@ -29,37 +59,36 @@ class AudioGenerator:
         self._thread = None
         self._vlc_process = None
         
+        # Bursts are scheduled on the monotonic clock and realigned to PTP
+        # time every few bursts
+        self._resync_bursts = 60
+        
         # Generate the tone burst
         self._generate_tone_burst()
     
     def _generate_tone_burst(self) -> None:
-        """Generate the 440 Hz tone burst audio file."""
+        """Generate the 440 Hz tone burst audio file, unless it already exists."""
         try:
-            # Calculate samples for the burst duration
-            samples = int(self.config.audio.sample_rate * self.config.audio.burst_duration)
-            
-            # Generate time array
-            t = np.linspace(0, self.config.audio.burst_duration, samples, False)
-            
-            # Generate 440 Hz sine wave
+            # The file name encodes the parameters, so an existing file is current
+            sample_rate = self.config.audio.sample_rate
             frequency = self.config.audio.tone_frequency
-            tone = np.sin(2 * np.pi * frequency * t)
+            key = hashlib.blake2b(
+                f"{sample_rate}-{self.config.audio.burst_duration}-{frequency}".encode(),
+                digest_size=8
+            ).hexdigest()
+            output_path = Path(__file__).parent / f"tone_burst_{key}.wav"
             
-            # Apply fade in/out to avoid clicks
-            fade_samples = int(0.01 * self.config.audio.sample_rate)  # 10ms fade
-            if fade_samples > 0:
-                fade_in = np.linspace(0, 1, fade_samples)
-                fade_out = np.linspace(1, 0, fade_samples)
-                
-                tone[:fade_samples] *= fade_in
-                tone[-fade_samples:] *= fade_out
+            if output_path.exists():
+                self.logger.info(f"Using existing tone burst: {output_path.name}")
+                return
             
-            # Normalize to 16-bit range
-            tone = (tone * 32767).astype(np.int16)
+            tone = _build_tone(sample_rate, self.config.audio.burst_duration, frequency)
             
-            # Save to file
-            output_path = Path(__file__).parent / "tone_burst.wav"
-            sf.write(output_path, tone, self.config.audio.sample_rate)
+            # Save to a temporary file and move it into place, so concurrent
+            # generators never see a partially written file
+            tmp_path = output_path.with_name(f".{output_path.stem}.{os.getpid()}.tmp")
+            sf.write(tmp_path, tone, sample_rate, format='WAV')
+            os.replace(tmp_path, output_path)
             
             self.logger.info(f"Generated tone burst: {frequency} Hz, {self.config.audio.burst_duration}s")
             
@@ -95,6 +124,8 @@ class AudioGenerator:
         if self._thread:
             self._thread.join(timeout=5)
         
+        self.ptp_time.close()
+        
         self.logger.info("Audio generator stopped")
     
     def _run(self) -> None:
@@ -103,10 +134,24 @@ class AudioGenerator:
             # Start VLC with loopback
             self._start_vlc()
             
-            # Main timing loop
+            # Main timing loop, sleeping towards absolute deadlines so that
+            # scheduler jitter does not accumulate between bursts
+            interval = self.config.audio.burst_interval
+            next_deadline = None
+            bursts_since_sync = 0
+            
             while self._running:
+                if next_deadline is None or bursts_since_sync >= self._resync_bursts:
+                    next_deadline = self._sync_next_burst(next_deadline)
+                    bursts_since_sync = 0
+                    if next_deadline is None:
+                        time.sleep(0.1)  # Fallback if PTP unavailable
+                        continue
+                
                 # Wait for next burst time
-                self._wait_for_next_burst()
+                wait_time = next_deadline - time.monotonic()
+                if wait_time > 0:
+                    time.sleep(wait_time)
                 
                 if not self._running:
                     break
@@ -114,6 +159,13 @@ class AudioGenerator:
                 # Trigger tone burst
                 self._trigger_burst()
                 
+                next_deadline += interval
+                bursts_since_sync += 1
+                
+                # Realign rather than firing a backlog of late bursts
+                if next_deadline < time.monotonic():
+                    next_deadline = None
+                
         except Exception as e:
             self.logger.error(f"Error in audio generation loop: {e}")
         finally:
@@ -161,20 +213,25 @@ class AudioGenerator:
             finally:
                 self._vlc_process = None
     
-    def _wait_for_next_burst(self) -> None:
-        """Wait until the next scheduled burst time."""
+    def _sync_next_burst(self, expected: Optional[float] = None) -> Optional[float]:
+        """Get the monotonic time of the next burst boundary in PTP time.
+        
+        When resyncing, expected is the deadline the loop would otherwise use;
+        the boundary nearest to it is returned so a correction never skips or
+        repeats a burst.
+        """
         current_ptp_time = self.ptp_time.get_ptp_time()
+        now = time.monotonic()
         if current_ptp_time is None:
-            time.sleep(0.1)  # Fallback if PTP unavailable
-            return
+            return None
         
         # Calculate time until next burst
-        time_since_epoch = current_ptp_time
-        next_burst = (time_since_epoch // self.config.audio.burst_interval + 1) * self.config.audio.burst_interval
-        wait_time = next_burst - time_since_epoch
-        
-        if wait_time > 0:
-            time.sleep(wait_time)
+        interval = self.config.audio.burst_interval
+        if expected is None:
+            next_burst = (current_ptp_time // interval + 1) * interval
+        else:
+            next_burst = round((current_ptp_time + expected - now) / interval) * interval
+        return now + (next_burst - current_ptp_time)
     
     def _trigger_burst(self) -> None:
         """Trigger a tone burst."""
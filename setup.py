@@ -45,6 +45,9 @@ setup(
             "flake8>=3.9.0",
             "mypy>=0.910",
         ],
+        "async": [
+            "httpx[http2]>=0.23.0",
+        ],
     },
     entry_points={
         "console_scripts": [
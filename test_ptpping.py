@@ -3,12 +3,37 @@
 Test script for PTPPing installation and basic functionality.
 """
 
+import io
+import os
 import sys
+import shutil
 import subprocess
 import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+class ThreadOutput(io.TextIOBase):
+    """Stdout replacement collecting each registered thread's output separately."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._buffers = {}
+    
+    def register(self, buffer):
+        self._buffers[threading.get_ident()] = buffer
+    
+    def unregister(self):
+        self._buffers.pop(threading.get_ident(), None)
+    
+    def write(self, text):
+        return self._buffers.get(threading.get_ident(), self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+
 def test_imports():
     """Test if all required modules can be imported."""
     print("Testing module imports...")
@@ -16,10 +41,10 @@ def test_imports():
     required_modules = [
         'numpy',
         'scipy',
-        'pyaudio',
+        'sounddevice',
         'soundfile',
         'influxdb_client',
-        'toml',
+        'tomllib' if sys.version_info >= (3, 11) else 'toml',
         'click',
         'requests'
     ]
@@ -55,26 +80,20 @@ def test_ptp_tools():
     missing_tools = []
     
     for tool, description in ptp_tools:
-        try:
-            result = subprocess.run([tool, '--help'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                print(f"  ✓ {tool} ({description})")
-            else:
-                print(f"  ✗ {tool} ({description}): command failed")
-                missing_tools.append(tool)
-        except FileNotFoundError:
+        # Look the tool up on PATH instead of spawning it
+        path = shutil.which(tool)
+        if path is not None:
+            print(f"  ✓ {tool} ({description}): {path}")
+        else:
             print(f"  ✗ {tool} ({description}): not found")
             missing_tools.append(tool)
-        except subprocess.TimeoutExpired:
-            print(f"  ✓ {tool} ({description}): available (help timeout)")
     
     if missing_tools:
         print(f"\nMissing PTP tools: {', '.join(missing_tools)}")
         return False
     
     print("  All PTP tools available!")
-    return False
+    return True
 
 
 def test_audio_devices():
@@ -82,31 +101,23 @@ def test_audio_devices():
     print("\nTesting audio devices...")
     
     try:
-        import pyaudio
+        import sounddevice as sd
         
-        audio = pyaudio.PyAudio()
-        device_count = audio.get_device_count()
+        devices = sd.query_devices()
         
-        print(f"  Found {device_count} audio devices:")
+        print(f"  Found {len(devices)} audio devices:")
         
         loopback_devices = []
         
-        for i in range(device_count):
-            try:
-                device_info = audio.get_device_info_by_index(i)
-                device_name = device_info['name']
-                max_inputs = device_info['maxInputChannels']
-                
-                if max_inputs > 0:
-                    print(f"    {i}: {device_name} (inputs: {max_inputs})")
-                    
-                    if 'loopback' in device_name.lower():
-                        loopback_devices.append(i)
+        for i, device_info in enumerate(devices):
+            device_name = device_info['name']
+            max_inputs = device_info['max_input_channels']
+            
+            if max_inputs > 0:
+                print(f"    {i}: {device_name} (inputs: {max_inputs})")
                 
-            except Exception as e:
-                print(f"    {i}: Error getting device info: {e}")
-        
-        audio.terminate()
+                if 'loopback' in device_name.lower():
+                    loopback_devices.append(i)
         
         if loopback_devices:
             print(f"  ✓ Found {len(loopback_devices)} loopback devices")
@@ -116,7 +127,7 @@ def test_audio_devices():
             return False
             
     except ImportError:
-        print("  ✗ PyAudio not available")
+        print("  ✗ sounddevice not available")
         return False
     except Exception as e:
         print(f"  ✗ Error testing audio devices: {e}")
@@ -135,8 +146,13 @@ def test_config_file():
     
     if config_path.exists():
         try:
-            import toml
-            config_data = toml.load(config_path)
+            if sys.version_info >= (3, 11):
+                import tomllib
+                with open(config_path, 'rb') as f:
+                    config_data = tomllib.load(f)
+            else:
+                import toml
+                config_data = toml.load(config_path)
             
             required_sections = ['ptp', 'audio', 'network', 'influxdb', 'grafana', 'logging', 'monitoring']
             
@@ -158,6 +174,21 @@ def test_config_file():
         return False
 
 
+def _is_running(name):
+    """Check whether a process with the given command name is running, from /proc."""
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/comm') as f:
+                if f.read().strip() == name:
+                    return True
+        except OSError:
+            # Process exited while scanning
+            continue
+    return False
+
+
 def test_ptp_interface():
     """Test PTP interface configuration."""
     print("\nTesting PTP interface...")
@@ -179,10 +210,7 @@ def test_ptp_interface():
             
             # Check if PTP daemon is running
             try:
-                result = subprocess.run(['pgrep', 'ptp4l'], 
-                                      capture_output=True, text=True, timeout=5)
-                
-                if result.returncode == 0:
+                if _is_running('ptp4l'):
                     print("  ✓ PTP daemon (ptp4l) is running")
                     return True
                 else:
@@ -202,6 +230,21 @@ def test_ptp_interface():
         return False
 
 
+def run_test(test_name, test_func, output):
+    """Run one test, returning its result and everything it printed."""
+    buffer = io.StringIO()
+    output.register(buffer)
+    try:
+        result = test_func()
+    except Exception as e:
+        print(f"  ✗ {test_name} test failed with exception: {e}")
+        result = False
+    finally:
+        output.unregister()
+    
+    return result, buffer.getvalue()
+
+
 def main():
     """Run all tests."""
     print("PTPPing Installation Test")
@@ -217,13 +260,23 @@ def main():
     
     results = []
     
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print(f"  ✗ {test_name} test failed with exception: {e}")
-            results.append((test_name, False))
+    # The checks are independent and mostly wait on subprocesses and device
+    # enumeration, so run them concurrently and print their output in order
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [
+                (test_name, executor.submit(run_test, test_name, test_func, output))
+                for test_name, test_func in tests
+            ]
+            outcomes = [(test_name, future.result()) for test_name, future in futures]
+    finally:
+        sys.stdout = output.stream
+    
+    for test_name, (result, text) in outcomes:
+        print(text, end='')
+        results.append((test_name, result))
     
     print("\n" + "=" * 40)
     print("Test Results Summary")